@@ -21,6 +21,7 @@ try:
     from .services.retell_service import RetellService
     from .services.openai_service import OpenAIService
     from .services.call_processor import CallProcessor
+    from .services.circuit_breaker import CallerError, CircuitTimeoutError
 except ImportError as e:
     logger.error(f"Import error: {e}")
     # Create dummy services for testing
@@ -31,8 +32,16 @@ except ImportError as e:
     OpenAIService = DummyService
     CallProcessor = DummyService
 
+    class CallerError(Exception):
+        pass
+
+    class CircuitTimeoutError(Exception):
+        pass
+
 load_dotenv()
 
+OPENAI_HEDGE_REQUESTS = os.getenv("OPENAI_HEDGE_REQUESTS", "false").lower() == "true"
+
 app = FastAPI(title="AI Voice Agent Tool", version="1.0.0")
 
 # CORS middleware
@@ -50,7 +59,10 @@ try:
         api_key=os.getenv("RETELL_API_KEY"),
         agent_id=os.getenv("RETELL_AGENT_ID")
     )
-    openai_service = OpenAIService(api_key=os.getenv("OPENAI_API_KEY"))
+    openai_service = OpenAIService(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        hedge_requests=OPENAI_HEDGE_REQUESTS
+    )
     call_processor = CallProcessor(openai_service)
     logger.info("Services initialized successfully")
 except Exception as e:
@@ -73,6 +85,16 @@ async def health_check():
             "openai": openai_service is not None,
             "call_processor": call_processor is not None
         },
+        "circuit_breakers": {
+            name: service.breaker.status()
+            for name, service in (
+                ("retell", retell_service),
+                ("openai", openai_service),
+                ("openai_analysis", call_processor)
+            )
+            if getattr(service, "breaker", None) is not None
+        },
+        "openai_hedging": OPENAI_HEDGE_REQUESTS,
         "env_vars": {
             "SUPABASE_URL": bool(os.getenv("SUPABASE_URL")),
             "SUPABASE_KEY": bool(os.getenv("SUPABASE_KEY")),
@@ -195,6 +217,15 @@ async def trigger_call(request: CallTriggerRequest):
                 webhook_url=webhook_url
             )
             logger.info(f"Retell call created: {call_id}")
+        except CallerError as retell_error:
+            db.table('call_logs').update({"call_outcome": "Failed"}).eq('id', call_log['id']).execute()
+            raise HTTPException(status_code=400, detail=str(retell_error))
+        except CircuitTimeoutError as retell_error:
+            db.table('call_logs').update({"call_outcome": "Unconfirmed"}).eq('id', call_log['id']).execute()
+            raise HTTPException(
+                status_code=504,
+                detail=f"{retell_error}. The call may still have been placed."
+            )
         except Exception as retell_error:
             logger.warning(f"Retell call creation failed: {retell_error}")
             # Generate a dummy call ID for testing
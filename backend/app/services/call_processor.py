@@ -1,13 +1,28 @@
 from .openai_service import OpenAIService
+from .circuit_breaker import CircuitBreaker
 import json
 from typing import Dict, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Post-call analysis is not latency-sensitive: give each attempt a generous
+# timeout and let the SDK retry, within a fixed overall budget
+ANALYSIS_ATTEMPT_TIMEOUT = 30.0
+ANALYSIS_MAX_RETRIES = 2
+ANALYSIS_TOTAL_TIMEOUT = 100.0
+
 class CallProcessor:
     def __init__(self, openai_service: OpenAIService):
         self.openai_service = openai_service
+        # Separate from the live-turn breaker so slow analyses neither open it
+        # nor skew its latency percentiles
+        self.breaker = CircuitBreaker(
+            "openai_analysis",
+            default_timeout=ANALYSIS_TOTAL_TIMEOUT,
+            min_timeout=ANALYSIS_TOTAL_TIMEOUT,
+            max_timeout=ANALYSIS_TOTAL_TIMEOUT
+        )
     
     async def process_transcript(self, transcript: str, driver_name: str, load_number: str) -> Dict[str, Any]:
         """Process call transcript to extract structured data"""
@@ -52,8 +67,10 @@ If the call was incomplete or the driver was unresponsive:
 
 Analyze the following transcript and return ONLY the JSON:"""
 
-        try:
-            response = self.openai_service.client.chat.completions.create(
+        def create_completion(timeout: float):
+            return self.openai_service.create_chat_completion(
+                ANALYSIS_ATTEMPT_TIMEOUT,
+                max_retries=ANALYSIS_MAX_RETRIES,
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -62,6 +79,9 @@ Analyze the following transcript and return ONLY the JSON:"""
                 max_tokens=200,
                 temperature=0.1
             )
+
+        try:
+            response = await self.breaker.call(create_completion)
             
             result = response.choices[0].message.content.strip()
             
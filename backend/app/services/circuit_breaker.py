@@ -0,0 +1,203 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the breaker is open"""
+
+class CircuitTimeoutError(asyncio.TimeoutError):
+    """Raised when a call exceeds the timeout the breaker gave it"""
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"Circuit '{name}' call timed out after {timeout:.2f}s")
+        self.timeout = timeout
+
+class CallerError(Exception):
+    """Raised by a wrapped call for errors caused by our own input (e.g. a 4xx).
+
+    The breaker re-raises these without counting them as upstream failures.
+    """
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        default_timeout: float = 10.0,
+        min_timeout: float = 1.0,
+        max_timeout: float = 30.0,
+        timeout_multiplier: float = 1.5,
+        window_size: int = 100,
+        min_samples: int = 10
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        # Bumped on every state change so late results from earlier states are ignored
+        self.generation = 0
+        self.latencies = deque(maxlen=window_size)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of recent latencies (timeouts count at their limit)"""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def current_timeout(self) -> float:
+        """Timeout adapted to observed p99 latency, clamped to sane bounds"""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Delay before sending a duplicate request (observed p95 latency)"""
+        return self.percentile(95)
+
+    def _set_state(self, state: str):
+        self.state = state
+        self.generation += 1
+
+    def _admit(self) -> Optional[Tuple[int, bool]]:
+        """Return a (generation, is_trial) ticket, or None if the call is rejected"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                return None
+            logger.info(f"Circuit '{self.name}' half-open, allowing trial request")
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self.trial_in_flight:
+                return None
+            self.trial_in_flight = True
+            return (self.generation, True)
+        return (self.generation, False)
+
+    def _release(self, ticket: Tuple[int, bool]):
+        """Free the half-open trial slot without changing state"""
+        generation, is_trial = ticket
+        if is_trial and generation == self.generation:
+            self.trial_in_flight = False
+
+    def record_success(self, latency: Optional[float], ticket: Tuple[int, bool]):
+        generation, is_trial = ticket
+        if latency is not None:
+            self.latencies.append(latency)
+        if generation != self.generation:
+            return
+        self.consecutive_failures = 0
+        if is_trial:
+            logger.info(f"Circuit '{self.name}' closed")
+            self.trial_in_flight = False
+            self.opened_at = None
+            self._set_state(self.CLOSED)
+
+    def record_failure(self, ticket: Tuple[int, bool]):
+        generation, is_trial = ticket
+        if generation != self.generation:
+            return
+        self.consecutive_failures += 1
+        if is_trial or self.consecutive_failures >= self.failure_threshold:
+            logger.warning(f"Circuit '{self.name}' opened after {self.consecutive_failures} consecutive failures")
+            self.trial_in_flight = False
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    async def call(self, func: Callable[[float], Awaitable[Any]], hedge: bool = False) -> Any:
+        """Run func(timeout) under the breaker, optionally hedging after p95.
+
+        Raises CircuitOpenError without calling func when the breaker is open,
+        and CircuitTimeoutError when func exceeds its adaptive timeout.
+        """
+        ticket = self._admit()
+        if ticket is None:
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        # The half-open trial gets the full budget, so an upstream that settled
+        # at a slower but healthy latency can still close the breaker
+        timeout = self.max_timeout if ticket[1] else self.current_timeout()
+        # Never duplicate the half-open trial
+        hedge_delay = self.hedge_delay() if hedge and not ticket[1] else None
+        start = time.monotonic()
+        try:
+            if hedge_delay is not None and hedge_delay < timeout:
+                result, latency = await asyncio.wait_for(self._hedged(func, timeout, hedge_delay), timeout)
+            else:
+                result = await asyncio.wait_for(func(timeout), timeout)
+                latency = time.monotonic() - start
+        except (asyncio.CancelledError, CallerError):
+            self._release(ticket)
+            raise
+        except asyncio.TimeoutError:
+            # Censored sample: the call took at least this long, so the window
+            # can learn a latency shift instead of only seeing calls that fit
+            self.latencies.append(timeout)
+            self.record_failure(ticket)
+            raise CircuitTimeoutError(self.name, timeout) from None
+        except Exception:
+            self.record_failure(ticket)
+            raise
+        self.record_success(latency, ticket)
+        return result
+
+    async def _hedged(
+        self, func: Callable[[float], Awaitable[Any]], timeout: float, hedge_delay: float
+    ) -> Tuple[Any, Optional[float]]:
+        """Return the first successful result of a primary and a delayed duplicate.
+
+        The latency is only reported when the primary wins; a winning duplicate
+        would bias the window low and make hedges and timeouts ever tighter.
+        """
+        start = time.monotonic()
+        primary = asyncio.ensure_future(func(timeout))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if not done:
+                logger.info(f"Circuit '{self.name}' sending hedged request after {hedge_delay:.2f}s")
+                pending.add(asyncio.ensure_future(func(timeout - hedge_delay)))
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        latency = time.monotonic() - start if task is primary else None
+                        return task.result(), latency
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def status(self) -> Dict[str, Any]:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "timeout": round(self.current_timeout(), 3),
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "samples": len(self.latencies)
+        }
@@ -1,15 +1,26 @@
 import openai
 from typing import List, Dict, Any
+import asyncio
+import functools
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitTimeoutError
 
 logger = logging.getLogger(__name__)
 
 class OpenAIService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, hedge_requests: bool = False):
         self.api_key = api_key
+        self.hedge_requests = hedge_requests
+        self.breaker = CircuitBreaker("openai", default_timeout=10.0, max_timeout=20.0)
+        # The blocking client runs here rather than in the shared default executor,
+        # so slow OpenAI calls cannot starve other threaded work
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="openai")
         if api_key:
-            self.client = openai.OpenAI(api_key=api_key)
+            # The breaker's adaptive timeout is the only timeout/retry policy
+            self.client = openai.OpenAI(api_key=api_key, max_retries=0)
             self.test_mode = False
             logger.info("OpenAI service initialized")
         else:
@@ -17,6 +28,15 @@ class OpenAIService:
             self.test_mode = True
             logger.warning("OpenAI API key not provided. Service will run in test mode.")
     
+    async def create_chat_completion(self, timeout: float, max_retries: int = 0, **kwargs):
+        """Run a chat completion on the dedicated executor with the given per-attempt timeout"""
+        client = self.client.with_options(max_retries=max_retries) if max_retries else self.client
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(client.chat.completions.create, timeout=timeout, **kwargs)
+        )
+    
     async def generate_agent_response(
         self, 
         user_message: str, 
@@ -70,15 +90,24 @@ Emergency keywords to watch for: accident, breakdown, blowout, medical, emergenc
         # Add current user message
         messages.append({"role": "user", "content": user_message})
         
-        try:
-            response = self.client.chat.completions.create(
+        def create_completion(timeout: float):
+            return self.create_chat_completion(
+                timeout,
                 model="gpt-4",
                 messages=messages,
                 max_tokens=150,
                 temperature=0.7
             )
+        
+        try:
+            response = await self.breaker.call(create_completion, hedge=self.hedge_requests)
             
             return response.choices[0].message.content.strip()
         except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
+            if isinstance(e, CircuitOpenError):
+                logger.warning(f"{e} - using fallback response")
+            elif isinstance(e, CircuitTimeoutError):
+                logger.error(f"OpenAI API timed out after {e.timeout:.2f}s")
+            else:
+                logger.error(f"OpenAI API error: {e}")
             return f"Hello {driver_name}, this is dispatch calling about load {load_number}. Can you give me a status update?"
@@ -3,6 +3,8 @@ import json
 from typing import Dict, Any
 import logging
 
+from .circuit_breaker import CallerError, CircuitBreaker, CircuitOpenError, CircuitTimeoutError
+
 logger = logging.getLogger(__name__)
 
 class RetellService:
@@ -10,6 +12,9 @@ class RetellService:
         self.api_key = api_key
         self.agent_id = agent_id
         self.base_url = "https://api.retellai.com"
+        # create-phone-call is not idempotent: never hedge it, and keep the timeout
+        # floor high so slow-but-successful creates are not abandoned while Retell dials
+        self.breaker = CircuitBreaker("retell", default_timeout=15.0, min_timeout=15.0, max_timeout=30.0)
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
@@ -30,15 +35,15 @@ class RetellService:
             # Return a test call ID
             return f"test_call_{hash(phone_number)}"
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "agent_id": self.agent_id,
-                    "to_number": phone_number,
-                    "webhook_url": webhook_url,
-                    "metadata": context
-                }
-                
+        payload = {
+            "agent_id": self.agent_id,
+            "to_number": phone_number,
+            "webhook_url": webhook_url,
+            "metadata": context
+        }
+        
+        async def post_call(timeout: float) -> str:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
                 logger.info(f"Creating Retell call to {phone_number}")
                 
                 async with session.post(
@@ -54,9 +59,24 @@ class RetellService:
                     else:
                         error_text = await response.text()
                         logger.error(f"Retell API error: {response.status} - {error_text}")
+                        # Rejections of our own input are not upstream failures
+                        if 400 <= response.status < 500 and response.status not in (408, 429):
+                            raise CallerError(f"Retell rejected call ({response.status}): {error_text}")
                         raise Exception(f"Failed to create call: {error_text}")
+        
+        try:
+            return await self.breaker.call(post_call)
+        except CallerError:
+            raise
+        except CircuitTimeoutError as e:
+            # Retell may still be dialing, so a test call ID would hide the real call
+            logger.error(f"Retell API timed out after {e.timeout:.2f}s - call outcome unknown")
+            raise
         except Exception as e:
-            logger.error(f"Error creating Retell call: {e}")
+            if isinstance(e, CircuitOpenError):
+                logger.warning(f"{e} - skipping Retell request")
+            else:
+                logger.error(f"Error creating Retell call: {e}")
             # Fall back to test mode
             logger.info("Falling back to test mode")
             return f"test_call_{hash(phone_number)}"
@@ -0,0 +1,222 @@
+import asyncio
+
+import pytest
+
+from app.services.circuit_breaker import (
+    CallerError,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitTimeoutError,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def sleeper(delay, result="ok"):
+    async def func(timeout):
+        await asyncio.sleep(delay)
+        return result
+    return func
+
+
+async def failing(timeout):
+    raise RuntimeError("upstream down")
+
+
+async def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(RuntimeError):
+            await breaker.call(failing)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_percentile_is_nearest_rank():
+    breaker = CircuitBreaker("test", min_samples=1)
+    breaker.latencies.extend([1.0] * 6 + [2.0] * 7)
+    assert breaker.percentile(50) == 2.0
+    assert breaker.percentile(0) == 1.0
+    assert breaker.percentile(100) == 2.0
+
+
+def test_percentile_needs_min_samples():
+    breaker = CircuitBreaker("test", min_samples=3, default_timeout=7.0)
+    breaker.latencies.extend([0.1, 0.2])
+    assert breaker.percentile(99) is None
+    assert breaker.current_timeout() == 7.0
+
+
+def test_timeout_reports_applied_timeout():
+    async def scenario():
+        breaker = CircuitBreaker("test", default_timeout=0.05)
+        with pytest.raises(CircuitTimeoutError) as excinfo:
+            await breaker.call(sleeper(1))
+        assert excinfo.value.timeout == 0.05
+        assert breaker.consecutive_failures == 1
+    run(scenario())
+
+
+def test_opens_after_threshold_and_rejects():
+    async def scenario():
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+        await open_breaker(breaker)
+        called = []
+
+        async def func(timeout):
+            called.append(timeout)
+
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(func)
+        assert called == []
+    run(scenario())
+
+
+def test_caller_error_is_not_counted():
+    async def scenario():
+        breaker = CircuitBreaker("test", failure_threshold=2)
+
+        async def rejected(timeout):
+            raise CallerError("bad phone number")
+
+        for _ in range(5):
+            with pytest.raises(CallerError):
+                await breaker.call(rejected)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.consecutive_failures == 0
+    run(scenario())
+
+
+def test_half_open_admits_single_trial():
+    async def scenario():
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+        await open_breaker(breaker)
+        trial = asyncio.ensure_future(breaker.call(sleeper(0.05)))
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(sleeper(0))
+        assert await trial == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+    run(scenario())
+
+
+def test_half_open_trial_failure_reopens():
+    async def scenario():
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+        await open_breaker(breaker)
+        with pytest.raises(RuntimeError):
+            await breaker.call(failing)
+        assert breaker.state == CircuitBreaker.OPEN
+    run(scenario())
+
+
+def test_stale_results_do_not_change_state():
+    async def scenario():
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+
+        async def slow_failing(timeout):
+            await asyncio.sleep(0.1)
+            raise RuntimeError("late failure")
+
+        late_success = asyncio.ensure_future(breaker.call(sleeper(0.1)))
+        late_failure = asyncio.ensure_future(breaker.call(slow_failing))
+        await asyncio.sleep(0)
+        await open_breaker(breaker)
+        opened_at = breaker.opened_at
+
+        await asyncio.sleep(0.06)
+        trial = asyncio.ensure_future(breaker.call(sleeper(0.1)))
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        await asyncio.gather(late_success, late_failure, return_exceptions=True)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.trial_in_flight
+        assert breaker.opened_at == opened_at
+
+        await trial
+        assert breaker.state == CircuitBreaker.CLOSED
+    run(scenario())
+
+
+def test_late_failure_does_not_extend_open_period():
+    async def scenario():
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+
+        async def slow_failing(timeout):
+            await asyncio.sleep(0.05)
+            raise RuntimeError("late failure")
+
+        late_failure = asyncio.ensure_future(breaker.call(slow_failing))
+        await asyncio.sleep(0)
+        await open_breaker(breaker)
+        opened_at = breaker.opened_at
+        with pytest.raises(RuntimeError):
+            await late_failure
+        assert breaker.opened_at == opened_at
+    run(scenario())
+
+
+def test_recovers_after_latency_shift():
+    async def scenario():
+        breaker = CircuitBreaker(
+            "test", recovery_timeout=0.05, min_timeout=0.001, max_timeout=1.0
+        )
+        for _ in range(20):
+            await breaker.call(sleeper(0.01))
+        assert breaker.current_timeout() < 0.05
+
+        successes = 0
+        for _ in range(40):
+            try:
+                await breaker.call(sleeper(0.05))
+                successes += 1
+            except (CircuitOpenError, CircuitTimeoutError):
+                await asyncio.sleep(0.02)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert successes > 25
+        assert breaker.current_timeout() > 0.05
+    run(scenario())
+
+
+def test_fast_failing_primary_is_not_hedged():
+    async def scenario():
+        breaker = CircuitBreaker("test", min_samples=1)
+        breaker.latencies.extend([0.05] * 10)
+        calls = []
+
+        async def func(timeout):
+            calls.append(timeout)
+            raise RuntimeError("fails fast")
+
+        with pytest.raises(RuntimeError):
+            await breaker.call(func, hedge=True)
+        assert len(calls) == 1
+    run(scenario())
+
+
+def test_slow_primary_is_hedged_without_recording_duplicate_latency():
+    async def scenario():
+        breaker = CircuitBreaker("test", min_samples=1, min_timeout=0.5)
+        breaker.latencies.extend([0.02] * 10)
+        timeouts = []
+
+        async def func(timeout):
+            timeouts.append(timeout)
+            await asyncio.sleep(1 if len(timeouts) == 1 else 0)
+            return len(timeouts)
+
+        assert await breaker.call(func, hedge=True) == 2
+        assert timeouts == [pytest.approx(0.5), pytest.approx(0.48)]
+        assert len(breaker.latencies) == 10
+    run(scenario())
+
+
+def test_hedged_primary_win_records_latency():
+    async def scenario():
+        breaker = CircuitBreaker("test", min_samples=1, min_timeout=0.5)
+        breaker.latencies.extend([0.05] * 10)
+        assert await breaker.call(sleeper(0.01), hedge=True) == "ok"
+        assert len(breaker.latencies) == 11
+    run(scenario())